@@ -0,0 +1,236 @@
+"""This module builds lightweight plotly animations of ship tracks from geoCSVs."""
+
+import math
+import os
+import numpy as np
+import pandas as pd
+import plotly.colors
+
+from openspace_rvdata.tracks import get_comment_dataframe
+
+def _read_track(source):
+    """
+    Reads a ship track into sorted time, longitude and latitude arrays.
+
+    Parameters
+    ----------
+    source : str or pandas.DataFrame
+        Either the path to a geoCSV file, or a DataFrame with 'ship_longitude'
+        and 'ship_latitude' columns and either an 'iso_time' column or a
+        DatetimeIndex (as returned by `get_cruise_nav`).
+
+    Returns
+    -------
+    tuple
+        (label, times, lon, lat), where `times` is an int64 array of
+        nanoseconds since the epoch and `label` is the cruise ID if it can be
+        determined, otherwise None.
+    """
+    label = None
+    if isinstance(source, pd.DataFrame):
+        df = source
+    else:
+        df = pd.read_csv(source, comment='#', usecols=['iso_time', 'ship_longitude', 'ship_latitude'])
+        mdf = get_comment_dataframe(source)
+        if 'cruise_id' in mdf.index:
+            label = mdf.loc['cruise_id', 'Value']
+        else:
+            label = os.path.basename(source)
+
+    if 'iso_time' in df.columns:
+        times = pd.DatetimeIndex(pd.to_datetime(df['iso_time'], utc=True))
+    else:
+        times = pd.DatetimeIndex(pd.to_datetime(df.index, utc=True))
+
+    track = pd.DataFrame({
+        'time': times.tz_convert(None).values.astype('datetime64[ns]').astype('int64'),
+        'lon': pd.to_numeric(df['ship_longitude'], errors='coerce').to_numpy(),
+        'lat': pd.to_numeric(df['ship_latitude'], errors='coerce').to_numpy(),
+    }).dropna().sort_values('time')
+
+    return (label,
+            track['time'].to_numpy(dtype='int64'),
+            track['lon'].to_numpy(dtype=float),
+            track['lat'].to_numpy(dtype=float))
+
+def _decimate(times, lon, lat, max_points):
+    """Keeps at most `max_points` evenly spaced fixes, always including the first and last."""
+    if len(times) <= max_points:
+        return times, lon, lat
+    keep = np.unique(np.linspace(0, len(times) - 1, max_points).round().astype(int))
+    return times[keep], lon[keep], lat[keep]
+
+def get_track_animation(cruises, n_frames=200, max_points=1000, title="Ship Tracks",
+                        projection="natural earth", frame_duration=100, precision=4, height=600):
+    """
+    Builds a compact, decimated plotly animation of one or more ship tracks.
+
+    Unlike ``px.scatter_geo(animation_frame=...)``, which creates one frame per
+    fix and re-embeds the whole trail in every frame, the trail of each cruise
+    is decimated to at most `max_points` fixes and split into roughly
+    sqrt(`max_points` / 2) fixed segments. Every segment is stored once in the
+    base figure; frames only toggle segment visibility and carry the short partial
+    segment leading up to the current position. All cruises share a common
+    timeline of `n_frames` frames, so the size of the output depends on
+    `n_frames` and the number of cruises rather than on the length of the
+    geoCSVs.
+
+    Parameters
+    ----------
+    cruises : str, pandas.DataFrame, list or dict
+        A geoCSV path or navigation DataFrame (e.g. from `get_cruise_nav`), a
+        list of them, or a dict mapping labels to them. Cruises from geoCSVs
+        are labelled with the 'cruise_id' in their comment header.
+    n_frames : int, default 200
+        Number of animation frames spanning the earliest to the latest fix.
+    max_points : int, default 1000
+        Maximum number of fixes kept per cruise trail.
+    title : str, default "Ship Tracks"
+        Figure title.
+    projection : str, default "natural earth"
+        Plotly geo projection type (e.g. "orthographic", "mercator").
+    frame_duration : int, default 100
+        Duration of each frame during playback, in milliseconds.
+    precision : int, default 4
+        Number of decimal places kept for coordinates in the figure.
+    height : int, default 600
+        Figure height in pixels.
+
+    Returns
+    -------
+    dict
+        The animated figure as a plotly figure dict, with play/pause buttons
+        and a time slider. Frames only hold the properties that change, so
+        the figure is not wrapped in a ``go.Figure``, whose validation would
+        dominate the build time; pass it to ``plotly.io.show`` or
+        ``plotly.io.write_html`` with ``validate=False``.
+
+    Examples
+    --------
+    >>> import plotly.io as pio
+    >>> import openspace_rvdata.animation as anim
+    >>> fig = anim.get_track_animation(["tmp/RR2402_1min.geoCSV"], n_frames=150)
+    >>> pio.write_html(fig, "plots/RR2402.html", validate=False)
+    """
+    if isinstance(cruises, dict):
+        sources = list(cruises.items())
+    elif isinstance(cruises, (str, os.PathLike, pd.DataFrame)):
+        sources = [(None, cruises)]
+    else:
+        sources = [(None, source) for source in cruises]
+
+    tracks = []
+    for i, (label, source) in enumerate(sources):
+        read_label, times, lon, lat = _read_track(source)
+        if len(times) == 0:
+            print(f"Skipping cruise {label or read_label or i}: no valid fixes.")
+            continue
+        times, lon, lat = _decimate(times, lon, lat, max_points)
+        tracks.append({
+            'label': str(label or read_label or f"Cruise {i + 1}"),
+            'times': times,
+            'lon': lon.round(precision),
+            'lat': lat.round(precision),
+        })
+
+    if not tracks:
+        raise ValueError("No valid ship track fixes found in the given cruises.")
+
+    # Common timeline for all cruises
+    t_start = min(track['times'][0] for track in tracks)
+    t_end = max(track['times'][-1] for track in tracks)
+    frame_times = np.linspace(t_start, t_end, max(int(n_frames), 1)).astype('int64')
+    frame_labels = pd.to_datetime(frame_times, utc=True).strftime("%Y-%m-%d %H:%M")
+
+    colors = plotly.colors.qualitative.Plotly
+    data = []
+    for i, track in enumerate(tracks):
+        color = colors[i % len(colors)]
+        n_points = len(track['times'])
+        # About sqrt(n / 2) segments of sqrt(2n) fixes, which balances the visibility toggles
+        # every frame carries against the length of the partial segment it re-embeds
+        block = max(1, math.ceil(math.sqrt(2 * n_points)))
+        n_blocks = math.ceil((n_points - 1) / block)
+        track['block'] = block
+        track['n_blocks'] = n_blocks
+        # Index of the last fix at or before each frame time (-1 before departure)
+        track['last'] = np.searchsorted(track['times'], frame_times, side='right') - 1
+
+        # Completed trail segments, each stored once and shown or hidden per frame
+        for b in range(n_blocks):
+            end = min((b + 1) * block, n_points - 1) + 1
+            data.append({'type': 'scattergeo', 'mode': 'lines', 'visible': False,
+                         'lon': track['lon'][b * block:end].tolist(),
+                         'lat': track['lat'][b * block:end].tolist(),
+                         'line': {'color': color, 'width': 2}, 'legendgroup': track['label'],
+                         'showlegend': False, 'hoverinfo': 'skip'})
+        # Partial segment leading up to the current position
+        data.append({'type': 'scattergeo', 'mode': 'lines', 'lon': [], 'lat': [],
+                     'line': {'color': color, 'width': 2}, 'legendgroup': track['label'],
+                     'name': track['label'], 'hoverinfo': 'skip'})
+        # Current position
+        data.append({'type': 'scattergeo', 'mode': 'markers', 'lon': [], 'lat': [],
+                     'marker': {'color': color, 'size': 8}, 'legendgroup': track['label'],
+                     'showlegend': False, 'name': track['label']})
+
+    # Frames are plain dicts covering every trace in order, so they need no 'traces' list
+    # and skip plotly's per-object validation; each only carries what changes per frame.
+    frames = []
+    for k in range(len(frame_times)):
+        frame_data = []
+        for track in tracks:
+            last = int(track['last'][k])
+            block = track['block']
+            n_blocks = track['n_blocks']
+            full = n_blocks if last == len(track['times']) - 1 else max(last, 0) // block
+            frame_data.extend({'visible': b < full} for b in range(n_blocks))
+            tail = slice(full * block, last + 1) if full < n_blocks else slice(0, 0)
+            frame_data.append({'lon': track['lon'][tail].tolist(), 'lat': track['lat'][tail].tolist()})
+            head = slice(last, last + 1) if last >= 0 else slice(0, 0)
+            frame_data.append({'lon': track['lon'][head].tolist(), 'lat': track['lat'][head].tolist()})
+        # Frame names must be unique; the timestamp is only used as the slider label
+        frames.append({'name': str(k), 'data': frame_data})
+
+    # Start on the first frame
+    for trace, update in zip(data, frames[0]['data']):
+        trace.update(update)
+
+    all_lon = np.concatenate([track['lon'] for track in tracks])
+    all_lat = np.concatenate([track['lat'] for track in tracks])
+    pad_lon = max(1.0, 0.1 * float(np.ptp(all_lon)))
+    pad_lat = max(1.0, 0.1 * float(np.ptp(all_lat)))
+
+    play_args = {'frame': {'duration': frame_duration, 'redraw': True},
+                 'transition': {'duration': 0}, 'fromcurrent': True}
+    pause_args = {'frame': {'duration': 0, 'redraw': False}, 'mode': 'immediate',
+                  'transition': {'duration': 0}}
+
+    layout = {
+        'title': {'text': title},
+        'height': height,
+        'geo': {
+            'projection': {'type': projection},
+            'lonaxis': {'range': [max(-180.0, float(all_lon.min()) - pad_lon),
+                                  min(180.0, float(all_lon.max()) + pad_lon)]},
+            'lataxis': {'range': [max(-90.0, float(all_lat.min()) - pad_lat),
+                                  min(90.0, float(all_lat.max()) + pad_lat)]},
+            'landcolor': "rgb(243, 243, 243)",
+            'countrycolor': "rgb(204, 204, 204)",
+        },
+        'updatemenus': [{
+            'type': 'buttons',
+            'showactive': False,
+            'x': 0.1, 'y': 0, 'xanchor': 'right', 'yanchor': 'top',
+            'buttons': [
+                {'label': 'Play', 'method': 'animate', 'args': [None, play_args]},
+                {'label': 'Pause', 'method': 'animate', 'args': [[None], pause_args]},
+            ],
+        }],
+        'sliders': [{
+            'x': 0.1, 'len': 0.9, 'y': 0, 'yanchor': 'top',
+            'currentvalue': {'prefix': 'Time: '},
+            'steps': [{'label': frame_label, 'method': 'animate',
+                       'args': [[str(k)], pause_args]} for k, frame_label in enumerate(frame_labels)],
+        }],
+    }
+    return {'data': data, 'layout': layout, 'frames': frames}
@@ -0,0 +1,364 @@
+"""This module aggregates ship tracks into global density rasters and OpenSpace layer assets."""
+
+import glob
+import os
+import struct
+import zlib
+import numpy as np
+import pandas as pd
+
+from openspace_rvdata.tracks import get_comment_dataframe
+
+NS_PER_DAY = 86_400 * 10**9
+
+def new_track_density(resolution=0.5):
+    """
+    Creates an empty global ship-track density grid.
+
+    Parameters
+    ----------
+    resolution : float, default 0.5
+        Cell size in degrees. Must divide 180 evenly.
+
+    Returns
+    -------
+    dict
+        The density grid, with keys:
+        'resolution' : cell size in degrees.
+        'counts' : int64 array (n_lat, n_lon) of navigation fixes per cell.
+        'ship_days' : int64 array (n_lat, n_lon) of distinct (cruise, UTC day) pairs per cell.
+        'vessels' : dict mapping vessel names to per-vessel ship-day arrays.
+        'cruise_ids' : list of cruise IDs already aggregated.
+        'control_points' : dict mapping the cruise IDs aggregated from
+        control-point files only to their contribution ('cells', 'counts',
+        'ship_days' and 'vessel'), so it can be replaced when the
+        full-resolution file is added.
+        Row 0 is the northernmost band and column 0 starts at 180°W, as in an
+        equirectangular image.
+    """
+    n_lat = int(round(180 / resolution))
+    if not np.isclose(n_lat * resolution, 180):
+        raise ValueError(f"Resolution {resolution} does not divide 180 degrees evenly.")
+    shape = (n_lat, 2 * n_lat)
+    return {
+        'resolution': float(resolution),
+        'counts': np.zeros(shape, dtype='int64'),
+        'ship_days': np.zeros(shape, dtype='int64'),
+        'vessels': {},
+        'cruise_ids': [],
+        'control_points': {},
+    }
+
+def _remove_contribution(density, cruise_id):
+    """Subtracts the stored control-point contribution of a cruise from a density grid."""
+    contribution = density['control_points'].pop(cruise_id)
+    cells = contribution['cells']
+    density['counts'].reshape(-1)[cells] -= contribution['counts']
+    density['ship_days'].reshape(-1)[cells] -= contribution['ship_days']
+    if contribution['vessel'] in density['vessels']:
+        density['vessels'][contribution['vessel']].reshape(-1)[cells] -= contribution['ship_days']
+
+def _bin_track(density, times, lon, lat):
+    """
+    Returns the fix counts and ship-days contributed by a single track, as flat arrays.
+    """
+    resolution = density['resolution']
+    n_lat, n_lon = density['counts'].shape
+    rows = np.clip(np.floor((90.0 - lat) / resolution).astype('int64'), 0, n_lat - 1)
+    cols = np.floor((lon + 180.0) / resolution).astype('int64') % n_lon
+    cells = rows * n_lon + cols
+
+    counts = np.bincount(cells, minlength=n_lat * n_lon)
+    # One ship-day per distinct (cell, UTC day) visited by the cruise
+    days = times // NS_PER_DAY
+    cell_days = np.unique((days - days.min()) * (n_lat * n_lon) + cells)
+    ship_days = np.bincount(cell_days % (n_lat * n_lon), minlength=n_lat * n_lon)
+    return counts, ship_days
+
+def update_track_density(geocsv_files, density=None, mdf=None, resolution=0.5):
+    """
+    Adds ship tracks from local geoCSV files to a global density grid.
+
+    Cruises already in the grid (by the 'cruise_id' in the geoCSV comment
+    header) are skipped, so the grid can be updated incrementally as new
+    cruises are downloaded. If both the 1-minute and control-point files of a
+    cruise are given, the 1-minute file is used; a cruise aggregated from its
+    control points only is replaced once its 1-minute file is given. Empty or
+    unreadable files are skipped.
+
+    Parameters
+    ----------
+    geocsv_files : str or list of str
+        geoCSV paths, a glob pattern, or a directory (e.g. "tmp") whose
+        .geoCSV files are used.
+    density : dict, optional
+        A grid from `new_track_density`, `load_track_density` or a previous
+        call. If None, a new grid is created.
+    mdf : pandas.DataFrame, optional
+        Cruise metadata from `get_cruise_metadata`, used to look up the
+        'vessel_shortname' of each cruise for the per-vessel bands.
+    resolution : float, default 0.5
+        Cell size in degrees, used only when creating a new grid.
+
+    Returns
+    -------
+    dict
+        The updated density grid (updated in place if `density` was given).
+
+    Examples
+    --------
+    >>> import openspace_rvdata.density as dens
+    >>> density = dens.update_track_density("tmp")
+    >>> dens.save_track_density(density, "tmp/ship_track_density.npz")
+    """
+    if density is None:
+        density = new_track_density(resolution)
+
+    if isinstance(geocsv_files, str):
+        if os.path.isdir(geocsv_files):
+            geocsv_files = glob.glob(os.path.join(geocsv_files, "*.geoCSV"))
+        else:
+            geocsv_files = glob.glob(geocsv_files)
+    # Prefer full-resolution files over control points for the same cruise
+    geocsv_files = sorted(geocsv_files, key=lambda fname: "_1min" not in os.path.basename(fname))
+
+    vessels = {}
+    if mdf is not None and {'cruise_id', 'vessel_shortname'}.issubset(mdf.columns):
+        vessels = dict(zip(mdf['cruise_id'].astype(str), mdf['vessel_shortname']))
+
+    seen = set(density['cruise_ids'])
+    shape = density['counts'].shape
+    for fname in geocsv_files:
+        comments = get_comment_dataframe(fname)
+        if 'cruise_id' in comments.index:
+            cruise_id = comments.loc['cruise_id', 'Value']
+        else:
+            cruise_id = os.path.splitext(os.path.basename(fname))[0]
+        is_control = "_control" in os.path.basename(fname).lower()
+        if cruise_id in seen and (is_control or cruise_id not in density['control_points']):
+            continue
+
+        try:
+            df = pd.read_csv(fname, comment='#', usecols=['iso_time', 'ship_longitude', 'ship_latitude'])
+        except (pd.errors.EmptyDataError, ValueError) as e:
+            print(f"Skipping {fname}: {e}")
+            continue
+        df['iso_time'] = pd.to_datetime(df['iso_time'], utc=True, errors='coerce')
+        df['ship_longitude'] = pd.to_numeric(df['ship_longitude'], errors='coerce')
+        df['ship_latitude'] = pd.to_numeric(df['ship_latitude'], errors='coerce')
+        df = df.dropna()
+        if df.empty:
+            print(f"Skipping {fname}: no valid fixes.")
+            continue
+
+        times = df['iso_time'].dt.tz_convert(None).to_numpy().astype('datetime64[ns]').astype('int64')
+        counts, ship_days = _bin_track(density, times,
+                                       df['ship_longitude'].to_numpy(dtype=float),
+                                       df['ship_latitude'].to_numpy(dtype=float))
+        if cruise_id in density['control_points']:
+            _remove_contribution(density, cruise_id)
+            print(f"Replacing control points of {cruise_id} with {os.path.basename(fname)}.")
+        density['counts'] += counts.reshape(shape)
+        density['ship_days'] += ship_days.reshape(shape)
+        vessel = vessels.get(cruise_id)
+        if vessel is None or pd.isna(vessel):
+            vessel = ""
+        else:
+            if vessel not in density['vessels']:
+                density['vessels'][vessel] = np.zeros(shape, dtype='int64')
+            density['vessels'][vessel] += ship_days.reshape(shape)
+        if is_control:
+            cells = np.flatnonzero(counts)
+            density['control_points'][cruise_id] = {
+                'cells': cells, 'counts': counts[cells], 'ship_days': ship_days[cells], 'vessel': vessel}
+
+        if cruise_id not in seen:
+            density['cruise_ids'].append(cruise_id)
+            seen.add(cruise_id)
+        print(f"Added {cruise_id} ({len(df)} fixes) to track density.")
+
+    return density
+
+def save_track_density(density, fname):
+    """
+    Saves a density grid to a compressed .npz file.
+
+    Parameters
+    ----------
+    density : dict
+        The density grid from `update_track_density`.
+    fname : str
+        The output path (e.g. "tmp/ship_track_density.npz").
+    """
+    vessel_names = list(density['vessels'])
+    arrays = {f"vessel_{i}": density['vessels'][name] for i, name in enumerate(vessel_names)}
+    # Control-point contributions, concatenated; those of cruise i are control_cells[offsets[i]:offsets[i + 1]]
+    control = density['control_points']
+    contributions = list(control.values())
+    offsets = np.cumsum([0] + [len(item['cells']) for item in contributions])
+    for key in ('cells', 'counts', 'ship_days'):
+        arrays[f"control_{key}"] = (np.concatenate([item[key] for item in contributions])
+                                    if contributions else np.array([], dtype='int64'))
+    np.savez_compressed(fname,
+                        resolution=density['resolution'],
+                        counts=density['counts'],
+                        ship_days=density['ship_days'],
+                        vessel_names=np.array(vessel_names, dtype=str),
+                        cruise_ids=np.array(density['cruise_ids'], dtype=str),
+                        control_ids=np.array(list(control), dtype=str),
+                        control_vessels=np.array([item['vessel'] for item in contributions], dtype=str),
+                        control_offsets=offsets.astype('int64'),
+                        **arrays)
+    print(f"Track density saved to {fname}")
+
+def load_track_density(fname):
+    """
+    Loads a density grid saved with `save_track_density`.
+
+    Parameters
+    ----------
+    fname : str
+        The path to the .npz file.
+
+    Returns
+    -------
+    dict
+        The density grid, ready to be passed to `update_track_density`.
+    """
+    with np.load(fname) as data:
+        vessel_names = list(map(str, data['vessel_names']))
+        control_points = {}
+        if 'control_ids' in data:  # Not in grids saved before control points were tracked
+            splits = np.asarray(data['control_offsets'])[1:-1]
+            parts = zip(map(str, data['control_ids']), map(str, data['control_vessels']),
+                        *(np.split(np.asarray(data[f"control_{key}"]), splits)
+                          for key in ('cells', 'counts', 'ship_days')))
+            control_points = {cruise_id: {'cells': cells, 'counts': counts, 'ship_days': ship_days, 'vessel': vessel}
+                              for cruise_id, vessel, cells, counts, ship_days in parts}
+        return {
+            'resolution': float(data['resolution']),
+            'counts': data['counts'],
+            'ship_days': data['ship_days'],
+            'vessels': {name: data[f"vessel_{i}"] for i, name in enumerate(vessel_names)},
+            'cruise_ids': list(map(str, data['cruise_ids'])),
+            'control_points': control_points,
+        }
+
+def _write_png(fname, rgba):
+    """Writes an (height, width, 4) uint8 array as an RGBA PNG file."""
+    height, width, _ = rgba.shape
+    raw = b''.join(b'\x00' + rgba[row].tobytes() for row in range(height))
+
+    def chunk(tag, payload):
+        return (struct.pack(">I", len(payload)) + tag + payload
+                + struct.pack(">I", zlib.crc32(tag + payload) & 0xffffffff))
+
+    with open(fname, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw, 9)))
+        f.write(chunk(b'IEND', b''))
+
+def export_density_texture(density, fname, band="ship_days", vessel=None, color=(255, 128, 0)):
+    """
+    Exports a band of a density grid as a georeferenced, transparent PNG texture.
+
+    Values are log-scaled to opacity, so empty cells are fully transparent and
+    the layer can be overlaid on any globe texture. An ESRI world file
+    ('.pgw') is written next to the image so that it is georeferenced as a
+    global equirectangular (EPSG:4326) raster.
+
+    Parameters
+    ----------
+    density : dict
+        The density grid from `update_track_density`.
+    fname : str
+        The output PNG path.
+    band : {"ship_days", "counts"}, default "ship_days"
+        Which band to export. Ignored if `vessel` is given.
+    vessel : str, optional
+        Export the ship-days band of a single vessel instead.
+    color : tuple of int, default (255, 128, 0)
+        RGB color of the layer; matches the default ship trail color.
+    """
+    values = density['vessels'][vessel] if vessel is not None else density[band]
+    scaled = np.log1p(values.astype(float))
+    if scaled.max() > 0:
+        scaled /= scaled.max()
+
+    rgba = np.empty(values.shape + (4,), dtype='uint8')
+    rgba[..., :3] = color
+    rgba[..., 3] = np.round(scaled * 255).astype('uint8')
+    _write_png(fname, rgba)
+
+    resolution = density['resolution']
+    with open(os.path.splitext(fname)[0] + ".pgw", 'w', encoding='utf-8') as f:
+        f.write(f"{resolution}\n0\n0\n{-resolution}\n{-180 + resolution / 2}\n{90 - resolution / 2}\n")
+    print(f"Density texture saved to {fname}")
+
+def get_density_asset(density, name="ship_track_density", band="ship_days", vessel=None):
+    """
+    Generates an OpenSpace asset that overlays a density grid on Earth.
+
+    Writes 'tmp/{name}.png' (see `export_density_texture`) and
+    'tmp/{name}.asset', which adds the texture as an Earth overlay layer.
+    Rendering cost is that of a single texture, regardless of how many
+    cruises were aggregated.
+
+    Parameters
+    ----------
+    density : dict
+        The density grid from `update_track_density`.
+    name : str, default "ship_track_density"
+        Base name of the output files.
+    band : {"ship_days", "counts"}, default "ship_days"
+        Which band to export. Ignored if `vessel` is given.
+    vessel : str, optional
+        Export the ship-days band of a single vessel instead.
+
+    Examples
+    --------
+    >>> import openspace_rvdata.density as dens
+    >>> density = dens.update_track_density("tmp")
+    >>> dens.get_density_asset(density)
+    """
+    output_directory = "tmp"
+    os.makedirs(output_directory, exist_ok=True)
+    texture_path = os.path.join(output_directory, f"{name}.png")
+    export_density_texture(density, texture_path, band=band, vessel=vessel)
+
+    safe_name = name.replace(" ", "_").replace("-", "_").replace(".", "_")
+    subject = f"{vessel} ship-days" if vessel is not None else band.replace("_", "-")
+    lua_content = f"""local earth = asset.require("scene/solarsystem/planets/earth/earth")
+
+-- Global ship track density texture (equirectangular, EPSG:4326)
+local Layer = {{
+    Identifier = "ShipTrackDensity_{safe_name}",
+    Name = "Ship Track Density ({subject})",
+    Enabled = true,
+    FilePath = asset.resource("{name}.png"),
+    Description = [[Density of research vessel navigation ({subject}) aggregated from {len(density['cruise_ids'])} cruises on a {density['resolution']} degree grid.]]
+}}
+
+asset.onInitialize(function()
+    openspace.globebrowsing.addLayer(earth.Earth.Identifier, "Overlays", Layer)
+end)
+
+asset.onDeinitialize(function()
+    openspace.globebrowsing.deleteLayer(earth.Earth.Identifier, "Overlays", Layer)
+end)
+
+asset.export("layer", Layer)
+
+asset.meta = {{
+    Name = "Ship Track Density: {subject}",
+    Description = [[Where the research fleet has been, aggregated from R2R navigation data.]],
+    Author = "OpenSpace Team",
+    URL = "http://www.rvdata.us/",
+    License = "MIT license"
+}}
+"""
+    file_path = os.path.join(output_directory, f"{name}.asset")
+    with open(file_path, "w", encoding = "utf-8") as f:
+        f.write(lua_content)
+    print(f"Generated asset file: {file_path}")
@@ -0,0 +1,241 @@
+"""This module answers "which ships were at sea when" queries and merges their keyframes into one timeline."""
+
+import heapq
+import os
+import numpy as np
+import pandas as pd
+
+from openspace_rvdata.tracks import to_utc_ns, window_mask, read_geocsv_window
+
+# Nodes with at most this many cruises are stored as leaves and filtered with one vectorized comparison
+LEAF_SIZE = 64
+
+def _build_node(nodes, starts, ends, positions):
+    """
+    Recursively builds a centered interval tree node; returns its index in `nodes` (-1 if empty).
+    """
+    if len(positions) == 0:
+        return -1
+    node = len(nodes)
+    if len(positions) <= LEAF_SIZE:
+        nodes.append({'leaf': True, 'positions': positions,
+                      'starts': starts[positions], 'ends': ends[positions]})
+        return node
+
+    center = np.median(np.concatenate([starts[positions], ends[positions]]))
+    left = positions[ends[positions] < center]
+    right = positions[starts[positions] > center]
+    here = positions[(starts[positions] <= center) & (ends[positions] >= center)]
+
+    by_start = here[np.argsort(starts[here], kind='stable')]
+    by_end = here[np.argsort(ends[here], kind='stable')]
+    nodes.append(None)
+    nodes[node] = {
+        'leaf': False,
+        'center': center,
+        'by_start': by_start,
+        'starts': starts[by_start],
+        'by_end': by_end,
+        'ends': ends[by_end],
+        'left': _build_node(nodes, starts, ends, left),
+        'right': _build_node(nodes, starts, ends, right),
+    }
+    return node
+
+def build_interval_index(mdf, start_column="depart_date", end_column="arrive_date"):
+    """
+    Builds an interval index over the time spans of cruises.
+
+    The index is a centered interval tree: each node holds the cruises that
+    span its center time, sorted by start and by end, so a query only visits
+    one root-to-leaf path and reads contiguous slices of matching cruises
+    instead of scanning every row. Small subtrees are stored as leaves of at
+    most `LEAF_SIZE` cruises.
+
+    Parameters
+    ----------
+    mdf : pandas.DataFrame
+        Cruise metadata, as returned by `get_cruise_metadata`.
+    start_column : str, default "depart_date"
+        Column holding the start of each cruise.
+    end_column : str, default "arrive_date"
+        Column holding the end of each cruise. Missing ends are treated as
+        equal to the start.
+
+    Returns
+    -------
+    dict
+        The index, with keys 'nodes' and 'root' (the tree), 'starts' and
+        'ends' (int64 nanoseconds, UTC, by row position), 'by_start' and
+        'sorted_starts' (row positions sorted by start, and their starts) and
+        'cruise_ids' (the cruise ID of each row position). Rows without a
+        start time are not indexed.
+
+    Examples
+    --------
+    >>> import openspace_rvdata.r2r2df as r2r
+    >>> import openspace_rvdata.fleet as flt
+    >>> mdf = r2r.get_cruise_metadata("https://service.rvdata.us/api/cruise/")
+    >>> index = flt.build_interval_index(mdf)
+    >>> at_sea = mdf.iloc[flt.cruises_at(index, "2024-02-20T12:00:00Z")]
+    """
+    starts = pd.to_datetime(mdf[start_column], utc=True, errors='coerce')
+    ends = pd.to_datetime(mdf[end_column], utc=True, errors='coerce').fillna(starts)
+    valid = starts.notna().to_numpy()
+
+    starts_ns = np.zeros(len(mdf), dtype='int64')
+    ends_ns = np.zeros(len(mdf), dtype='int64')
+    starts_ns[valid] = to_utc_ns(starts[valid])
+    ends_ns[valid] = np.maximum(to_utc_ns(ends[valid]), starts_ns[valid])
+    positions = np.flatnonzero(valid)
+
+    nodes = []
+    root = _build_node(nodes, starts_ns, ends_ns, positions)
+    by_start = positions[np.argsort(starts_ns[positions], kind='stable')]
+    if 'cruise_id' in mdf.columns:
+        cruise_ids = mdf['cruise_id'].astype(str).to_numpy()
+    else:
+        cruise_ids = np.arange(len(mdf)).astype(str)
+    return {
+        'nodes': nodes,
+        'root': root,
+        'starts': starts_ns,
+        'ends': ends_ns,
+        'by_start': by_start,
+        'sorted_starts': starts_ns[by_start],
+        'cruise_ids': cruise_ids,
+    }
+
+def _stab(index, time_ns):
+    """Returns the row positions of cruises whose span contains `time_ns`, unsorted."""
+    found = []
+    node_id = index['root']
+    while node_id != -1:
+        node = index['nodes'][node_id]
+        if node['leaf']:
+            found.append(node['positions'][(node['starts'] <= time_ns) & (node['ends'] >= time_ns)])
+            break
+        if time_ns < node['center']:
+            # Every cruise here ends after the center; keep those that have started
+            found.append(node['by_start'][:np.searchsorted(node['starts'], time_ns, side='right')])
+            node_id = node['left']
+        elif time_ns > node['center']:
+            # Every cruise here starts before the center; keep those that have not ended
+            found.append(node['by_end'][np.searchsorted(node['ends'], time_ns, side='left'):])
+            node_id = node['right']
+        else:
+            found.append(node['by_start'])
+            break
+    return np.concatenate(found) if found else np.array([], dtype='int64')
+
+def cruises_at(index, time):
+    """
+    Finds the cruises at sea at a given instant.
+
+    Parameters
+    ----------
+    index : dict
+        The index from `build_interval_index`.
+    time : str or datetime-like
+        The instant (UTC if no timezone is given).
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted row positions of the active cruises, for use with ``mdf.iloc``.
+        ``index['cruise_ids'][positions]`` gives their cruise IDs.
+    """
+    return np.sort(_stab(index, to_utc_ns(time)[0]))
+
+def cruises_between(index, start, end):
+    """
+    Finds the cruises at sea at any time during a window.
+
+    Parameters
+    ----------
+    index : dict
+        The index from `build_interval_index`.
+    start : str or datetime-like
+        Start of the window (inclusive, UTC if no timezone is given).
+    end : str or datetime-like
+        End of the window (inclusive).
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted row positions of the cruises overlapping the window.
+    """
+    start_ns = to_utc_ns(start)[0]
+    end_ns = to_utc_ns(end)[0]
+    if end_ns < start_ns:
+        raise ValueError("The end of the window must not be before its start.")
+    # Cruises already at sea at the start, plus those departing during the window
+    first = np.searchsorted(index['sorted_starts'], start_ns, side='right')
+    last = np.searchsorted(index['sorted_starts'], end_ns, side='right')
+    return np.sort(np.concatenate([_stab(index, start_ns), index['by_start'][first:last]]))
+
+def _iter_keyframes(cruise_id, source, start=None, end=None):
+    """
+    Yields (time_ns, cruise_id, row) for the navigation fixes of one cruise, in time order.
+    """
+    if isinstance(source, pd.DataFrame):
+        df = source
+    elif start is None and end is None:
+        df = pd.read_csv(source, comment='#')
+    else:
+        df = read_geocsv_window(source, start, end)
+
+    if 'iso_time' in df.columns:
+        times = to_utc_ns(df['iso_time'])
+    else:
+        times = to_utc_ns(df.index)
+    mask = window_mask(times, start, end)
+    order = np.argsort(times, kind='stable')
+    order = order[mask[order]]
+
+    rows = df.iloc[order].itertuples(index=False)
+    for time_ns, row in zip(times[order], rows):
+        yield int(time_ns), cruise_id, row
+
+def iter_fleet_timeline(tracks, start=None, end=None):
+    """
+    Merges the keyframes of several cruises into a single time-ordered stream.
+
+    Each cruise is read and sorted on its own, then the streams are k-way
+    merged with a heap, so a synchronized multi-ship playback can step
+    through all fixes in time order without concatenating and re-sorting
+    them. Only the merge is incremental: every track is read into a
+    DataFrame when the merge starts, so all tracks are held in memory at
+    once. Pass `start` and `end` to limit how much of each geoCSV is read.
+
+    Parameters
+    ----------
+    tracks : dict or list
+        Maps cruise IDs to geoCSV paths or navigation DataFrames (with an
+        'iso_time' column or a DatetimeIndex, as from `get_cruise_nav`). A
+        list of geoCSV paths is also accepted, labelled by file name.
+    start : str or datetime-like, optional
+        Only yield fixes at or after this time. geoCSVs are then read with
+        `read_geocsv_window`.
+    end : str or datetime-like, optional
+        Only yield fixes at or before this time.
+
+    Yields
+    ------
+    tuple
+        (time, cruise_id, row), where `time` is a UTC pandas.Timestamp and
+        `row` is the fix as a namedtuple of the track's columns.
+
+    Examples
+    --------
+    >>> import openspace_rvdata.fleet as flt
+    >>> active = index['cruise_ids'][flt.cruises_at(index, "2024-02-20")]
+    >>> tracks = {cruise_id: f"tmp/{cruise_id}_1min.geoCSV" for cruise_id in active}
+    >>> for time, cruise_id, row in flt.iter_fleet_timeline(tracks, "2024-02-20", "2024-02-21"):
+    ...     print(time, cruise_id, row.ship_longitude, row.ship_latitude)
+    """
+    if not isinstance(tracks, dict):
+        tracks = {os.path.splitext(os.path.basename(path))[0]: path for path in tracks}
+    streams = [_iter_keyframes(cruise_id, source, start, end) for cruise_id, source in tracks.items()]
+    for time_ns, cruise_id, row in heapq.merge(*streams, key=lambda item: item[0]):
+        yield pd.Timestamp(time_ns, tz='UTC'), cruise_id, row
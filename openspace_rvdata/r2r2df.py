@@ -1,11 +1,27 @@
 """This module provides functions to pull data from the R2R repository."""
 
+import codecs
+import concurrent.futures
+import functools
+import hashlib
+import importlib.util
 import os
 import tarfile
+import threading
+import time
+import shutil
 import re # For regular expressions to find the correct geoCSV file
 import json # Added for parsing nested JSON strings
 import pandas as pd
 import requests # This library is essential for making HTTP requests
+import urllib3
+
+from openspace_rvdata.tracks import read_geocsv_window
+
+# Background downloads of full-resolution navigation by cruise ID; see get_cruise_nav_preview
+_PREFETCHES = {}
+# At most this many background downloads run at once
+_PREFETCH_SLOTS = threading.BoundedSemaphore(4)
 
 def get_r2r_url(cruise_id=None, doi=None, vessel_name=None):
     """
@@ -67,33 +83,205 @@ def get_r2r_url(cruise_id=None, doi=None, vessel_name=None):
 
     raise ValueError("At least one argument (cruise_id, doi, or vessel_name) must be provided.")
 
-def get_cruise_metadata(url):
+# Columns of the cruise catalog that are converted to datetimes and floats
+DATE_COLUMNS = ['depart_date', 'arrive_date', 'release_date', 'release_date_sent', 'release_sent']
+NUMERIC_COLUMNS = ['longitude_min', 'longitude_max', 'latitude_min', 'latitude_max']
+
+def _iter_json_records(chunks, key="data", header=None):
     """
-    Fetches cruise data from the rvdata.us API and parses it into a pandas DataFrame.
+    Incrementally parses a JSON object and yields the elements of one of its array members.
+
+    Only the text of the record currently being decoded is held in memory, so
+    the full response never has to be materialized as a single dict tree.
 
     Parameters
     ----------
-    url : str
-        The URL for the cruise(s) of interest; e.g.,
-        "https://service.rvdata.us/api/cruise/cruise_id/RR2402"
-        "https://service.rvdata.us/api/cruise/doi/910464"
-        "https://service.rvdata.us/api/cruise/vessel/Revelle"
+    chunks : iterable of bytes
+        The UTF-8 encoded JSON body, e.g. from `requests.Response.iter_content`.
+    key : str, default "data"
+        The top-level key of the array whose elements should be yielded.
+    header : dict, optional
+        If given, the other top-level members (e.g. 'status') are stored here.
+
+    Yields
+    ------
+    object
+        Each decoded element of the `key` array, in order.
+
+    Raises
+    ------
+    json.JSONDecodeError
+        If the body is not valid JSON or ends prematurely.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    state = {'buf': '', 'pos': 0, 'eof': False}
+
+    def read_more():
+        for chunk in chunks:
+            if chunk:
+                state['buf'] = state['buf'][state['pos']:] + text_decoder.decode(chunk)
+                state['pos'] = 0
+                return True
+        state['eof'] = True
+        return False
+
+    def next_char():
+        # Skip whitespace and return the next significant character without consuming it
+        while True:
+            buf = state['buf']
+            pos = state['pos']
+            while pos < len(buf) and buf[pos] in ' \t\n\r':
+                pos += 1
+            state['pos'] = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not read_more():
+                raise json.JSONDecodeError("Unexpected end of JSON input", buf, pos)
+
+    def expect(char):
+        found = next_char()
+        if found != char:
+            raise json.JSONDecodeError(f"Expected '{char}'", state['buf'], state['pos'])
+        state['pos'] += 1
+
+    def decode_value():
+        next_char()
+        while True:
+            try:
+                value, end = decoder.raw_decode(state['buf'], state['pos'])
+                # A number followed only by number characters (e.g. '6.' or '1e') may continue in the next chunk
+                truncated = (isinstance(value, (int, float)) and not isinstance(value, bool)
+                             and set(state['buf'][end:]) <= set('0123456789+-.eE'))
+                if not truncated or state['eof'] or not read_more():
+                    state['pos'] = end
+                    return value
+            except json.JSONDecodeError:
+                if not read_more():
+                    raise
+
+    expect('{')
+    if next_char() == '}':
+        return
+    while True:
+        name = decode_value()
+        expect(':')
+        if name == key:
+            expect('[')
+            if next_char() == ']':
+                state['pos'] += 1
+            else:
+                while True:
+                    yield decode_value()
+                    if next_char() == ']':
+                        state['pos'] += 1
+                        break
+                    expect(',')
+        else:
+            value = decode_value()
+            if header is not None:
+                header[name] = value
+        if next_char() == '}':
+            return
+        expect(',')
+
+def _split_keywords(keyword):
+    """
+    Splits a Series of comma-separated keyword strings into a Series of lists.
+
+    Missing values and empty items are dropped; rows without keywords get an empty list. The
+    column is cast to object first, since `pd.json_normalize` yields an all-NaN float column
+    when no record has a keyword.
+    """
+    parts = keyword.astype(object).str.split(',').explode().str.strip()
+    parts = parts[parts.notna() & (parts != '')]
+    lists = parts.groupby(level=0, sort=False).agg(list)
+    missing = keyword.index.difference(lists.index)
+    lists = pd.concat([lists, pd.Series([[] for _ in missing], index=missing, dtype=object)])
+    return lists.reindex(keyword.index)
+
+def _format_cruise_metadata(df):
+    """
+    Parses keywords into lists and converts date and numeric columns of a cruise DataFrame.
+    """
+    # Parse the 'keyword' column into a list
+    if 'keyword' in df.columns:
+        df['keyword_list'] = _split_keywords(df['keyword'])
+        df = df.drop(columns=['keyword'])
+
+    # Convert date columns to datetime objects; 'coerce' will turn unparseable dates into NaT
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    # Convert specific numeric columns (like lat/lon min/max) that might be strings
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    return df
+
+def _read_cruise_records(records, columns=None):
+    """
+    Builds a cruise DataFrame column by column from an iterable of record dicts.
+
+    Parameters
+    ----------
+    records : iterable of dict
+        Cruise records, e.g. from `_iter_json_records`.
+    columns : list of str, optional
+        Keys to keep. If None, every key seen in any record is kept. Requested
+        keys that no record has are dropped, as with `pd.json_normalize`.
 
     Returns
     -------
     pandas.DataFrame
-        A DataFrame containing the cruise data, or an empty
-        DataFrame if data fetching fails or is empty.
+        A DataFrame with date and numeric columns already converted.
+    """
+    values = {col: [] for col in columns} if columns else {}
+    seen = set()
+    n_records = 0
+    for record in records:
+        if columns is None:
+            for col in record:
+                if col not in values:
+                    values[col] = [None] * n_records
+        for col, col_values in values.items():
+            col_values.append(record.get(col))
+        seen.update(record)
+        n_records += 1
 
-    Examples
-    --------
-    >>> import openspace_rvdata as r2r
-    >>> # Assuming you've generated a URL using get_r2r_url
-    >>> url = r2r.get_r2r_url(cruise_id="RR2402")
-    >>> mdf = r2r.get_cruise_metadata(url)
-    >>> print(mdf.head()) # Or some other way to show expected output
+    data = {}
+    for col in [col for col in values if col in seen]:
+        col_values = values.pop(col)
+        if col in DATE_COLUMNS:
+            data[col] = pd.to_datetime(pd.Series(col_values, dtype=object), errors='coerce')
+        elif col in NUMERIC_COLUMNS:
+            data[col] = pd.to_numeric(pd.Series(col_values, dtype=object), errors='coerce')
+        else:
+            data[col] = pd.Series(col_values, dtype=object)
+    return pd.DataFrame(data, index=pd.RangeIndex(n_records))
+
+def _fetch_cruise_metadata(url, stream=False, columns=None):
+    """
+    Fetches and formats cruise records; see `get_cruise_metadata`.
+
+    `columns` are names in the raw API records (i.e. 'keyword', not 'keyword_list').
     """
     try:
+        if stream:
+            with requests.get(url, timeout = 60, stream=True) as response:
+                response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
+                header = {}
+                records = _iter_json_records(response.iter_content(chunk_size=65536), "data", header)
+                df = _read_cruise_records(records, columns)
+            if header.get("status", 200) == 200 and not df.empty:
+                return _format_cruise_metadata(df)
+            print(f"API returned status: {header.get('status')}, "
+                  f"message: {header.get('status_message', 'No message')}")
+            return pd.DataFrame()
+
         response = requests.get(url, timeout = 60)
         response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
         data = response.json() # Parse the JSON response into a Python dictionary
@@ -102,28 +290,9 @@ def get_cruise_metadata(url):
         if data.get("status") == 200 and data.get("data"):
             # The actual records are in the 'data' key, which is a list of dictionaries
             df = pd.json_normalize(data['data'])
-
-            # --- Post-processing (as in the previous example) ---
-            # Parse the 'keyword' column into a list
-            if 'keyword' in df.columns:
-                df['keyword_list'] = df['keyword'].apply(
-                    lambda x: [item.strip() for item in x.split(',') if item.strip()] if pd.notna(x) else []
-                )
-                df = df.drop(columns=['keyword'])
-
-            # Convert date columns to datetime objects
-            date_columns = ['depart_date', 'arrive_date', 'release_date', 'release_date_sent', 'release_sent']
-            for col in date_columns:
-                if col in df.columns:
-                    df[col] = pd.to_datetime(df[col], errors='coerce') # 'coerce' will turn unparseable dates into NaT
-
-            # Convert specific numeric columns (like lat/lon min/max) that might be strings
-            numeric_cols = ['longitude_min', 'longitude_max', 'latitude_min', 'latitude_max']
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-            return df
+            if columns is not None:
+                df = df[[col for col in columns if col in df.columns]]
+            return _format_cruise_metadata(df)
         # else:
         print(f"API returned status: {data.get('status')}, message: {data.get('status_message', 'No message')}")
         return pd.DataFrame() # Return an empty DataFrame if no valid data
@@ -139,45 +308,145 @@ def get_cruise_metadata(url):
         print(f"Failed to decode JSON response: {e}")
     return pd.DataFrame()
 
-def get_cruise_nav(cruise_id: str, sampling_rate: str = "60min") -> pd.DataFrame:
+def compact_cruise_metadata(df, max_category_ratio=0.5):
     """
-    Fetches navigation data for a given cruise from the R2R repository (rvdata.org),
-    processes it, and returns a resampled pandas DataFrame.
+    Converts a cruise metadata DataFrame to a memory-compact representation.
 
-    Handles both .tar.gz archives and direct access to .geoCSV files within a
-    /data subdirectory.
+    - String columns with few distinct values (e.g. 'vessel_shortname',
+      'waterbody_name') become categoricals; other string columns become
+      Arrow-backed strings if pyarrow is installed, pandas strings otherwise.
+    - The per-row 'keyword_list' lists are moved to a separate, exploded
+      (cruise_id, keyword) table with categorical columns.
+    - Float and integer columns are downcast to the smallest dtype that holds
+      their values (e.g. float32 for latitude/longitude bounds).
+
+    Categorical columns only accept values among their categories; e.g. use
+    ``mdf['waterbody_name'].cat.add_categories("Not listed").fillna("Not listed")``
+    rather than a plain `fillna`.
 
     Parameters
     ----------
-    cruise_id : str
-        The ID of the cruise (e.g., "RR2402").
-    sampling_rate : str, default "60min"
-        The desired sampling rate for the output DataFrame
-        (e.g., "1min", "60min", "1H"). This string should be compatible
-        with pandas' resample method.
+    df : pandas.DataFrame
+        Cruise metadata, as returned by `get_cruise_metadata`.
+    max_category_ratio : float, default 0.5
+        String columns whose number of distinct values is at most this
+        fraction of the number of rows are stored as categoricals.
 
     Returns
     -------
-    pandas.DataFrame
-        A DataFrame containing the navigation data, resampled
-        to the specified rate. The DataFrame will have a DatetimeIndex.
+    tuple of pandas.DataFrame
+        (cruises, keywords): the compact cruise frame, and a frame with one
+        row per (cruise_id, keyword) pair.
+
+    Examples
+    --------
+    >>> import openspace_rvdata.r2r2df as r2r
+    >>> mdf, kdf = r2r.compact_cruise_metadata(r2r.get_cruise_metadata(url))
+    >>> lter = mdf[mdf['cruise_id'].isin(kdf.loc[kdf['keyword'] == "LTER", 'cruise_id'])]
+    """
+    # Exploded keyword table
+    if 'keyword_list' in df.columns:
+        ids = df['cruise_id'] if 'cruise_id' in df.columns else pd.Series(df.index, index=df.index)
+        exploded = df['keyword_list'].explode().dropna()
+        keywords = pd.DataFrame({
+            'cruise_id': pd.Categorical(ids.loc[exploded.index]),
+            'keyword': pd.Categorical(exploded),
+        })
+        df = df.drop(columns=['keyword_list'])
+    else:
+        keywords = pd.DataFrame({'cruise_id': pd.Categorical([]), 'keyword': pd.Categorical([])})
+
+    string_dtype = pd.StringDtype("pyarrow") if importlib.util.find_spec("pyarrow") else pd.StringDtype()
+    data = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            data[col] = series
+        elif pd.api.types.is_float_dtype(series):
+            data[col] = pd.to_numeric(series, downcast='float')
+        elif pd.api.types.is_integer_dtype(series):
+            data[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if pd.api.types.infer_dtype(series, skipna=True) not in ('string', 'empty'):
+                data[col] = series # Mixed or nested values are left as they are
+            elif series.nunique() <= max_category_ratio * len(series):
+                data[col] = series.astype('category')
+            else:
+                data[col] = series.astype(string_dtype)
+        else:
+            data[col] = series
+    return pd.DataFrame(data, index=df.index), keywords.reset_index(drop=True)
+
+def get_cruise_metadata(url, stream=False, columns=None, compact=False):
+    """
+    Fetches cruise data from the rvdata.us API and parses it into a pandas DataFrame.
+
+    Parameters
+    ----------
+    url : str
+        The URL for the cruise(s) of interest; e.g.,
+        "https://service.rvdata.us/api/cruise/cruise_id/RR2402"
+        "https://service.rvdata.us/api/cruise/doi/910464"
+        "https://service.rvdata.us/api/cruise/vessel/Revelle"
+        "https://service.rvdata.us/api/cruise/" (the full catalog)
+    stream : bool, default False
+        If True, records are parsed incrementally from the response body and
+        the DataFrame is built column by column, instead of loading the whole
+        response with `response.json()` and `pd.json_normalize`. This keeps
+        peak memory low for large listings such as the full catalog. Nested
+        objects in records are kept as-is rather than flattened.
+    columns : list of str, optional
+        Columns to keep (e.g. ['cruise_id', 'vessel_shortname', 'depart_date',
+        'arrive_date', 'keyword_list']). If None, all columns are kept.
+    compact : bool, default False
+        If True, return a memory-compact frame and a separate keyword table,
+        as produced by `compact_cruise_metadata`.
+
+    Returns
+    -------
+    pandas.DataFrame or tuple of pandas.DataFrame
+        A DataFrame containing the cruise data, or an empty
+        DataFrame if data fetching fails or is empty. If `compact` is True,
+        a tuple (cruises, keywords) as returned by `compact_cruise_metadata`.
+
+    Examples
+    --------
+    >>> import openspace_rvdata as r2r
+    >>> # Assuming you've generated a URL using get_r2r_url
+    >>> url = r2r.get_r2r_url(cruise_id="RR2402")
+    >>> mdf = r2r.get_cruise_metadata(url)
+    >>> print(mdf.head()) # Or some other way to show expected output
+    >>> # Load the full catalog, keeping only a few columns
+    >>> mdf = r2r.get_cruise_metadata("https://service.rvdata.us/api/cruise/", stream=True,
+    ...                               columns=['cruise_id', 'vessel_shortname', 'depart_date', 'arrive_date'])
+    """
+    # 'keyword_list' is derived from the raw 'keyword' field
+    source_columns = None
+    if columns is not None:
+        source_columns = ['keyword' if col == 'keyword_list' else col for col in columns]
+
+    df = _fetch_cruise_metadata(url, stream, source_columns)
+    if compact:
+        return compact_cruise_metadata(df)
+    return df
+
+def _get_navigation_product(cruise_id):
+    """
+    Looks up the 'Navigation' product of a cruise in the R2R fileset API.
+
+    Returns
+    -------
+    dict
+        The parsed 'product_info' entry of the Navigation product, including
+        its 'product_actual_url'.
 
     Raises
     ------
     requests.exceptions.RequestException
         If there's a problem with the network request.
-    FileNotFoundError
-        If the expected .geocsv file is not found after extraction/download.
     ValueError
-        If the 'Navigation' product type is not found or if a suitable
-        time column for resampling cannot be identified.
-
-    Examples
-    --------
-    >>> import openspace_rvdata as r2r
-    >>> gdf = r2r.get_cruise_nav(cruise_id="RR2402", sampling_rate="1min")
-    >>> gdf.head()
-"""
+        If the 'Navigation' product type or its URL is not found.
+    """
     # --- 1. Generate the initial URL ---
     base_api_url = "https://service.rvdata.us/api/fileset/cruise_id/"
     api_url = f"{base_api_url}{cruise_id}"
@@ -232,36 +501,190 @@ def get_cruise_nav(cruise_id: str, sampling_rate: str = "60min") -> pd.DataFrame
             print("DEBUG: No 'product_info' fields found or all failed to parse for any product_type_name.")
         raise ValueError(f"No 'Navigation' product type found within 'product_info' for cruise_id: {cruise_id}")
 
-    product_actual_url = navigation_entry_product_info.get('product_actual_url')
-    if not product_actual_url:
+    if not navigation_entry_product_info.get('product_actual_url'):
         raise ValueError(f"'product_actual_url' not found in Navigation product_info entry for cruise_id: {cruise_id}")
 
-    print(f"Processing data from: {product_actual_url}")
+    return navigation_entry_product_info
 
-    # --- 3. Set up temporary directory ---
-    tmp_dir = os.path.join(os.getcwd(), "tmp")
-    os.makedirs(tmp_dir, exist_ok=True) # Create /tmp subdirectory if it doesn't exist
+# Fileset API fields reporting the size (in bytes) and digests of a product file; only exact
+# names are used, since other fields mentioning a size or algorithm (e.g. 'file_size_kb') are not
+PRODUCT_SIZE_FIELDS = ['product_size_bytes', 'product_file_size', 'product_size', 'file_size_bytes', 'file_size']
+PRODUCT_CHECKSUM_FIELDS = {'product_sha256': 'sha256', 'sha256': 'sha256', 'product_sha1': 'sha1', 'sha1': 'sha1',
+                           'product_md5': 'md5', 'md5': 'md5', 'md5sum': 'md5'}
+DIGEST_LENGTHS = {'md5': 32, 'sha1': 40, 'sha256': 64}
+# Client error statuses that are retried like server errors (request timeout, rate limiting)
+RETRY_STATUS_CODES = (408, 429)
+
+def _expected_file_info(product_info):
+    """
+    Extracts the expected size and checksum of a product file from its fileset API entry, if reported.
+
+    Only `PRODUCT_SIZE_FIELDS` holding whole numbers of bytes and `PRODUCT_CHECKSUM_FIELDS`
+    holding hex digests of the right length are used.
+
+    Returns
+    -------
+    tuple
+        (size, checksum), where `size` is the size in bytes or None, and
+        `checksum` is an (algorithm, hex digest) tuple or None.
+    """
+    product_info = {key.lower(): value for key, value in (product_info or {}).items()}
+    sizes = (str(product_info.get(field, "")).strip() for field in PRODUCT_SIZE_FIELDS)
+    size = next((int(value) for value in sizes if value.isdigit()), None)
+    digests = ((algorithm, str(product_info.get(field, "")).strip().lower())
+               for field, algorithm in PRODUCT_CHECKSUM_FIELDS.items())
+    checksum = next(((algorithm, digest) for algorithm, digest in digests
+                     if re.fullmatch(f"[0-9a-f]{{{DIGEST_LENGTHS[algorithm]}}}", digest)), None)
+    return size, checksum
+
+def _download_file(url, target_path, expected_size=None, checksum=None, retries=5, chunk_size=8192):
+    """
+    Downloads a file with resumption, verification and an atomic move into place.
+
+    Data is written to '{target_path}.part'. If the connection drops, the
+    download resumes from the end of the partial file with an HTTP Range
+    request, including on a later call. Once complete, the file is checked
+    against `expected_size` and `checksum` if given, then renamed to
+    `target_path`.
+
+    Parameters
+    ----------
+    url : str
+        The URL to download.
+    target_path : str
+        The final path of the file.
+    expected_size : int, optional
+        Expected size in bytes.
+    checksum : tuple, optional
+        Expected (algorithm, hex digest), e.g. ('md5', '9e107d9d...').
+    retries : int, default 5
+        Number of attempts before giving up.
+    chunk_size : int, default 8192
+        Size of the chunks written to disk.
+
+    Raises
+    ------
+    requests.exceptions.HTTPError
+        For HTTP client errors (4xx) other than an unsatisfiable range,
+        request timeouts and rate limiting, which are retried like server
+        errors and dropped connections.
+    requests.exceptions.RequestException
+        If the download keeps failing after `retries` attempts.
+    ValueError
+        If the downloaded file does not match the expected size or checksum.
+    """
+    part_path = f"{target_path}.part"
+    for attempt in range(1, retries + 1):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if expected_size is not None and offset > expected_size:
+            os.remove(part_path) # Stale partial file from another version of the product
+            offset = 0
+        complete = expected_size is not None and offset == expected_size
+        if not complete:
+            # Ask for the stored bytes, so offsets in the .part file match Range offsets
+            headers = {'Accept-Encoding': 'identity', **({'Range': f"bytes={offset}-"} if offset else {})}
+            try:
+                with requests.get(url, stream=True, timeout = 60, headers=headers) as response:
+                    if response.status_code == 416 and offset:
+                        complete = True # Nothing left to fetch
+                    else:
+                        response.raise_for_status()
+                        if offset and response.status_code != 206:
+                            print("Server does not support resuming; restarting download.")
+                            offset = 0
+                        elif offset:
+                            range_start = re.match(r"bytes (\d+)-", response.headers.get('Content-Range', ''))
+                            if range_start is None or int(range_start.group(1)) != offset:
+                                os.remove(part_path) # Restart from the beginning on the next attempt
+                                raise requests.exceptions.ContentDecodingError(
+                                    f"Server returned range {response.headers.get('Content-Range')}, "
+                                    f"expected bytes from {offset}.")
+                            print(f"Resuming download of {os.path.basename(target_path)} at byte {offset}.")
+                        content_length = response.headers.get('Content-Length')
+                        written = 0
+                        with open(part_path, 'ab' if offset else 'wb') as f:
+                            # Raw bytes, so a Content-Encoding the server adds anyway is not decoded
+                            for chunk in response.raw.stream(chunk_size, decode_content=False):
+                                f.write(chunk)
+                                written += len(chunk)
+                        if content_length is not None and written < int(content_length):
+                            raise requests.exceptions.ChunkedEncodingError(
+                                f"Connection closed after {written} of {content_length} bytes.")
+                        complete = True
+            except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+                # Client errors will not go away on retry; server errors (e.g. from proxies) may
+                response = e.response if isinstance(e, requests.exceptions.HTTPError) else None
+                status = response.status_code if response is not None else None
+                if status is not None and status < 500 and status not in RETRY_STATUS_CODES:
+                    raise
+                print(f"Download of {url} interrupted (attempt {attempt}/{retries}): {e}")
+                if attempt == retries:
+                    raise
+                time.sleep(min(2 ** attempt, 30))
+                continue
+
+        size = os.path.getsize(part_path)
+        if expected_size is not None and size != expected_size:
+            os.remove(part_path)
+            raise ValueError(f"Downloaded {size} bytes from {url}, expected {expected_size}.")
+        if checksum is not None:
+            algorithm, expected_digest = checksum
+            digest = hashlib.new(algorithm)
+            with open(part_path, 'rb') as f:
+                for block in iter(functools.partial(f.read, 1 << 20), b''):
+                    digest.update(block)
+            if digest.hexdigest() != expected_digest:
+                os.remove(part_path)
+                raise ValueError(f"{algorithm} checksum mismatch for {url}: "
+                                 f"got {digest.hexdigest()}, expected {expected_digest}.")
+        os.replace(part_path, target_path)
+        return target_path
+    raise requests.exceptions.RetryError(f"Download of {url} was not attempted (retries={retries}).")
+
+def _extract_member(tar, member, tmp_dir):
+    """
+    Extracts a tar member into `tmp_dir` under its base name and returns its path.
+
+    The file is written under a temporary '.part' name and moved into place once
+    complete, so an interrupted extraction never leaves a truncated file that looks cached.
+    """
+    target_path_in_tmp = os.path.join(tmp_dir, os.path.basename(member.name))
+    with open(f"{target_path_in_tmp}.part", 'wb') as outfile:
+        shutil.copyfileobj(tar.extractfile(member), outfile)
+    os.replace(f"{target_path_in_tmp}.part", target_path_in_tmp)
+    print(f"  Extracted: {os.path.basename(member.name)}")
+    return target_path_in_tmp
+
+def _download_navigation(cruise_id, product_info, tmp_dir):
+    """
+    Downloads the .geoCSV files of a Navigation product into `tmp_dir`.
+
+    Handles both .tar.gz archives and direct access to .geoCSV files within a
+    /data subdirectory. Archives are downloaded resumably and verified against
+    the size/checksum in `product_info`, if reported. Returns the list of
+    downloaded/extracted file paths.
+    """
+    product_actual_url = product_info['product_actual_url']
     all_extracted_geocsv_files = [] # List to store paths of all extracted geoCSV files
     expected_geocsv_pattern = re.compile(r"\.geoCSV$", re.IGNORECASE)
 
-    # --- 4. Handle download based on product_actual_url extension ---
+    # --- 1. Handle download based on product_actual_url extension ---
     if product_actual_url.lower().endswith('.tar.gz'):
         print("Detected .tar.gz archive. Downloading and extracting...")
         archive_filename = os.path.join(tmp_dir, f"{cruise_id}_nav_data.tar.gz")
 
         try:
-            archive_response = requests.get(product_actual_url, stream=True, timeout = 60)
-            archive_response.raise_for_status()
-
-            with open(archive_filename, 'wb') as f:
-                for chunk in archive_response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            expected_size, checksum = _expected_file_info(product_info)
+            if checksum is None:
+                print("The fileset API reports no checksum for this archive; "
+                      + ("only its size is verified." if expected_size is not None else "it is not verified."))
+            _download_file(product_actual_url, archive_filename, expected_size, checksum)
             print(f"Downloaded archive to: {archive_filename}")
         except requests.exceptions.RequestException as e:
             print(f"Error downloading archive from {product_actual_url}: {e}")
             raise
 
-        # --- 5. Unzip the folder and bring .geoCSV files to /tmp ---
+        # --- 2. Unzip the folder and bring .geoCSV files to /tmp ---
         try:
             with tarfile.open(archive_filename, "r:gz") as tar:
                 members_to_extract = []
@@ -274,11 +697,7 @@ def get_cruise_nav(cruise_id: str, sampling_rate: str = "60min") -> pd.DataFrame
 
                 print(f"Found {len(members_to_extract)} .geoCSV files in the archive. Extracting all to /tmp...")
                 for member in members_to_extract:
-                    target_path_in_tmp = os.path.join(tmp_dir, os.path.basename(member.name))
-                    with open(target_path_in_tmp, 'wb') as outfile:
-                        outfile.write(tar.extractfile(member).read())
-                    all_extracted_geocsv_files.append(target_path_in_tmp)
-                    print(f"  Extracted: {os.path.basename(member.name)}")
+                    all_extracted_geocsv_files.append(_extract_member(tar, member, tmp_dir))
 
         except tarfile.ReadError as e:
             print(f"Error reading tar.gz file {archive_filename}: {e}")
@@ -311,14 +730,8 @@ def get_cruise_nav(cruise_id: str, sampling_rate: str = "60min") -> pd.DataFrame
             file_url = f"{data_subdirectory_url}{filename}"
             print(f"Attempting to download: {file_url}")
             try:
-                # Use stream=True for potentially large files, but for small geoCSV, it's fine.
-                file_response = requests.get(file_url, stream=True, timeout = 60)
-                file_response.raise_for_status() # Raise an exception for bad status codes
-
                 target_path_in_tmp = os.path.join(tmp_dir, filename)
-                with open(target_path_in_tmp, 'wb') as f:
-                    for chunk in file_response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                _download_file(file_url, target_path_in_tmp)
                 all_extracted_geocsv_files.append(target_path_in_tmp)
                 print(f"Successfully downloaded .geoCSV file: {filename}")
                 downloaded_any_geocsv = True
@@ -330,7 +743,31 @@ def get_cruise_nav(cruise_id: str, sampling_rate: str = "60min") -> pd.DataFrame
             raise FileNotFoundError(f"No .geoCSV file found in the /data subdirectory at {data_subdirectory_url} "
                                     f"using common naming conventions for cruise_id: {cruise_id}.")
 
-    # --- 6. Read in the contents of the *selected* .geoCSV file as a pandas DataFrame ---
+    return all_extracted_geocsv_files
+
+def _fetch_navigation(cruise_id, refresh=False, product_info=None):
+    """
+    Makes the full-resolution .geoCSV of a cruise available in the local /tmp store.
+
+    If '{cruise_id}_1min.geoCSV' is already in the store and `refresh` is
+    False, nothing is downloaded. `product_info` (from
+    `_get_navigation_product`) skips the fileset API lookup if already known.
+    Returns the path of the selected file.
+    """
+    # --- Set up temporary directory ---
+    tmp_dir = os.path.join(os.getcwd(), "tmp")
+    os.makedirs(tmp_dir, exist_ok=True) # Create /tmp subdirectory if it doesn't exist
+    local_geocsv = os.path.join(tmp_dir, f"{cruise_id}_1min.geoCSV")
+    if not refresh and os.path.exists(local_geocsv):
+        print(f"Using local .geoCSV file: {local_geocsv}")
+        return local_geocsv
+
+    if product_info is None:
+        product_info = _get_navigation_product(cruise_id)
+    print(f"Processing data from: {product_info['product_actual_url']}")
+    all_extracted_geocsv_files = _download_navigation(cruise_id, product_info, tmp_dir)
+
+    # Select the .geoCSV file to read
     selected_geocsv_to_read = None
     # Prioritize the "1min" file among the extracted/downloaded ones, if it exists
     for filepath in all_extracted_geocsv_files:
@@ -344,9 +781,18 @@ def get_cruise_nav(cruise_id: str, sampling_rate: str = "60min") -> pd.DataFrame
     if not selected_geocsv_to_read or not os.path.exists(selected_geocsv_to_read):
         raise FileNotFoundError(f"No suitable .geoCSV file found or extracted/downloaded for cruise_id: {cruise_id}.")
 
+    return selected_geocsv_to_read
+
+def _read_navigation_geocsv(selected_geocsv_to_read, start=None, end=None):
+    """
+    Reads a navigation .geoCSV file into a DataFrame indexed by time.
+    """
     print(f"Reading data from selected .geoCSV file: {os.path.basename(selected_geocsv_to_read)}")
     try:
-        df = pd.read_csv(selected_geocsv_to_read, comment='#')
+        if start is None and end is None:
+            df = pd.read_csv(selected_geocsv_to_read, comment='#')
+        else:
+            df = read_geocsv_window(selected_geocsv_to_read, start, end)
 
         time_col = None
         possible_time_cols = ['ISO_8601_UTC', 'Time_UTC', 'datetime', 'Timestamp', 'time']
@@ -381,16 +827,199 @@ def get_cruise_nav(cruise_id: str, sampling_rate: str = "60min") -> pd.DataFrame
     except Exception as e:
         print(f"Error reading or processing .geoCSV file {selected_geocsv_to_read}: {e}")
         raise
-    # finally:
-    #     # Clean up all temporary geoCSV files regardless of success or failure
-    #     for fpath in all_extracted_geocsv_files:
-    #         if os.path.exists(fpath):
-    #             os.remove(fpath)
-    #             print(f"Removed temporary .geoCSV file: {os.path.basename(fpath)}")
 
+    return df
+
+def get_cruise_nav(cruise_id: str, sampling_rate: str = "60min", start=None, end=None,
+                   refresh: bool = False) -> pd.DataFrame:
+    """
+    Fetches navigation data for a given cruise from the R2R repository (rvdata.org),
+    processes it, and returns a resampled pandas DataFrame.
+
+    Handles both .tar.gz archives and direct access to .geoCSV files within a
+    /data subdirectory. If a background download was started by
+    `get_cruise_nav_preview`, it is awaited instead of starting another one
+    (and, with `refresh`, before downloading again).
 
-    # --- 7. Resample the DataFrame ---
+    Parameters
+    ----------
+    cruise_id : str
+        The ID of the cruise (e.g., "RR2402").
+    sampling_rate : str, default "60min"
+        The desired sampling rate for the output DataFrame
+        (e.g., "1min", "60min", "1H"). This string should be compatible
+        with pandas' resample method.
+    start : str or datetime-like, optional
+        Start of the time window to read (inclusive, UTC if no timezone is
+        given). If `start` or `end` is given, only the rows within the window
+        are read from the .geoCSV file, using its sidecar time index (see
+        `openspace_rvdata.tracks.read_geocsv_window`).
+    end : str or datetime-like, optional
+        End of the time window to read (inclusive).
+    refresh : bool, default False
+        If False, a full-resolution '{cruise_id}_1min.geoCSV' already in the
+        local /tmp store (e.g. prefetched by `get_cruise_nav_preview`) is used
+        instead of downloading it again.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A DataFrame containing the navigation data, resampled
+        to the specified rate. The DataFrame will have a DatetimeIndex.
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        If there's a problem with the network request.
+    FileNotFoundError
+        If the expected .geocsv file is not found after extraction/download.
+    ValueError
+        If the 'Navigation' product type is not found, if a downloaded
+        archive does not match the size/checksum reported by the fileset API,
+        or if a suitable time column for resampling cannot be identified.
+
+    Examples
+    --------
+    >>> import openspace_rvdata as r2r
+    >>> gdf = r2r.get_cruise_nav(cruise_id="RR2402", sampling_rate="1min")
+    >>> gdf.head()
+    >>> # One week of a cruise
+    >>> gdf = r2r.get_cruise_nav(cruise_id="RR2402", start="2024-02-20", end="2024-02-27")
+"""
+    # --- 1. Wait for a pending background download, or fetch the .geoCSV ---
+    selected_geocsv_to_read = None
+    pending = _PREFETCHES.pop(cruise_id, None)
+    if pending is not None:
+        # Wait even when refreshing, so the two downloads never write the same .part file
+        try:
+            prefetched = pending.result()
+        except (requests.exceptions.RequestException, ValueError, OSError, tarfile.TarError) as e:
+            prefetched = None
+            print(f"Background download for {cruise_id} failed: {e}.")
+        if not refresh:
+            selected_geocsv_to_read = prefetched
+    if selected_geocsv_to_read is None:
+        selected_geocsv_to_read = _fetch_navigation(cruise_id, refresh)
+
+    # --- 2. Read in the contents of the selected .geoCSV file as a pandas DataFrame ---
+    df = _read_navigation_geocsv(selected_geocsv_to_read, start, end)
+
+    # --- 3. Resample the DataFrame ---
     print(f"Resampling data to: {sampling_rate}")
     df_resampled = df.resample(sampling_rate).mean()
 
     return df_resampled
+
+def _download_control_points(cruise_id, product_actual_url, tmp_dir):
+    """
+    Downloads only the control-point .geoCSV of a Navigation product into `tmp_dir`.
+
+    For .tar.gz archives, the archive is streamed and the download stops as
+    soon as the control-point file has been extracted. Other .geoCSV files
+    stored before it (e.g. the 1-minute track) have to be downloaded anyway,
+    so they are kept in `tmp_dir` for `get_cruise_nav` rather than discarded.
+    Returns the file path, or None if no control-point file was found.
+    """
+    control_pattern = re.compile(r"_control\.geoCSV$", re.IGNORECASE)
+    geocsv_pattern = re.compile(r"\.geoCSV$", re.IGNORECASE)
+    if product_actual_url.lower().endswith('.tar.gz'):
+        print("Detected .tar.gz archive. Streaming until the control-point file is found...")
+        with requests.get(product_actual_url, stream=True, timeout = 60) as archive_response:
+            archive_response.raise_for_status()
+            archive_response.raw.decode_content = True
+            with tarfile.open(fileobj=archive_response.raw, mode="r|gz") as tar:
+                for member in tar:
+                    if member.isfile() and control_pattern.search(member.name):
+                        return _extract_member(tar, member, tmp_dir)
+                    if member.isfile() and geocsv_pattern.search(member.name):
+                        _extract_member(tar, member, tmp_dir)
+        return None
+
+    file_url = f"{product_actual_url}/data/{cruise_id}_control.geoCSV"
+    print(f"Attempting to download: {file_url}")
+    try:
+        file_response = requests.get(file_url, timeout = 60)
+        file_response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Could not download control points from {file_url}: {e}")
+        return None
+    target_path_in_tmp = os.path.join(tmp_dir, f"{cruise_id}_control.geoCSV")
+    with open(f"{target_path_in_tmp}.part", 'wb') as f:
+        f.write(file_response.content)
+    os.replace(f"{target_path_in_tmp}.part", target_path_in_tmp)
+    return target_path_in_tmp
+
+def _start_prefetch(cruise_id, product_info=None):
+    """
+    Downloads the full-resolution navigation of a cruise in a daemon thread, so scripts never wait
+    for it at exit; returns a `concurrent.futures.Future` of the selected .geoCSV path.
+    """
+    future = concurrent.futures.Future()
+
+    def run():
+        with _PREFETCH_SLOTS:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(_fetch_navigation(cruise_id, False, product_info))
+            except Exception as e: # pylint:disable=W0718
+                future.set_exception(e)
+
+    threading.Thread(target=run, name=f"prefetch-{cruise_id}", daemon=True).start()
+    return future
+
+def get_cruise_nav_preview(cruise_id: str, prefetch: bool = False) -> pd.DataFrame:
+    """
+    Fetches the control-point navigation of a cruise for quick previews.
+
+    R2R Navigation products include a small control-point track
+    ('{cruise_id}_control.geoCSV', a few hundred points) alongside the much
+    larger 1-minute track. This function fetches only the control points, so
+    catalog maps and fleet overviews of many cruises are fast and cheap. The
+    full-resolution track is only fetched on first access, with
+    `get_cruise_nav`, unless `prefetch` is set.
+
+    Parameters
+    ----------
+    cruise_id : str
+        The ID of the cruise (e.g., "RR2402").
+    prefetch : bool, default False
+        If True, also download the full-resolution track into the local /tmp
+        store in a background thread, for cruises likely to be opened next
+        (not when previewing many cruises). A later `get_cruise_nav` call for
+        the same cruise waits for that download instead of starting a new one.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The control points, with a DatetimeIndex and no resampling. If the
+        product has no control-point file, the full-resolution track
+        resampled to 60 minutes is returned instead.
+
+    Examples
+    --------
+    >>> import openspace_rvdata.r2r2df as r2r
+    >>> previews = {cruise_id: r2r.get_cruise_nav_preview(cruise_id) for cruise_id in ["RR2402", "RR2403"]}
+    >>> preview = r2r.get_cruise_nav_preview("RR2404", prefetch=True)
+    >>> gdf = r2r.get_cruise_nav("RR2404", sampling_rate="1min") # Uses the prefetched file
+    """
+    tmp_dir = os.path.join(os.getcwd(), "tmp")
+    os.makedirs(tmp_dir, exist_ok=True) # Create /tmp subdirectory if it doesn't exist
+    full_geocsv = os.path.join(tmp_dir, f"{cruise_id}_1min.geoCSV")
+
+    control_geocsv = os.path.join(tmp_dir, f"{cruise_id}_control.geoCSV")
+    product_info = None
+    if os.path.exists(control_geocsv):
+        print(f"Using local .geoCSV file: {control_geocsv}")
+    else:
+        product_info = _get_navigation_product(cruise_id)
+        control_geocsv = _download_control_points(cruise_id, product_info['product_actual_url'], tmp_dir)
+
+    if prefetch and cruise_id not in _PREFETCHES and not os.path.exists(full_geocsv):
+        print(f"Fetching full-resolution navigation for {cruise_id} in the background.")
+        _PREFETCHES[cruise_id] = _start_prefetch(cruise_id, product_info)
+
+    if control_geocsv is None:
+        print(f"No control-point file found for {cruise_id}; using full-resolution navigation.")
+        return get_cruise_nav(cruise_id)
+    return _read_navigation_geocsv(control_geocsv)
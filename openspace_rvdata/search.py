@@ -0,0 +1,263 @@
+"""This module provides an inverted token index for fast keyword and name search over cruise metadata."""
+
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Metadata columns indexed by default; chief scientist columns are added automatically
+SEARCH_FIELDS = ['keyword_list', 'cruise_name', 'waterbody_name']
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def _normalize(text):
+    """Lowercases text and strips accents, e.g. 'Ñuñoa' -> 'nunoa'; matches the normalization in `_token_pairs`."""
+    return unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+
+def tokenize(text):
+    """
+    Splits text into normalized search tokens.
+
+    Parameters
+    ----------
+    text : str
+        Any text, e.g. a cruise name or a query.
+
+    Returns
+    -------
+    list of str
+        Lowercase, accent-free alphanumeric tokens.
+
+    Examples
+    --------
+    >>> import openspace_rvdata.search as srch
+    >>> srch.tokenize("Palmer LTER: Annual Cruise")
+    ['palmer', 'lter', 'annual', 'cruise']
+    """
+    return _TOKEN_PATTERN.findall(_normalize(text))
+
+def _token_pairs(values, positions):
+    """
+    Returns a DataFrame of (token, position) pairs for a Series of text values.
+    """
+    values = pd.Series(values, index=positions, dtype=object).dropna().astype(str)
+    normalized = values.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii').str.lower()
+    tokens = normalized.str.findall(_TOKEN_PATTERN).explode().dropna()
+    return pd.DataFrame({'token': tokens.to_numpy(dtype=str), 'position': tokens.index.to_numpy(dtype='int64')})
+
+def _build_postings(pairs, cruise_ids):
+    """
+    Builds the compressed posting lists of an index from (token, position) pairs.
+    """
+    pairs = pairs.drop_duplicates().sort_values(['token', 'position'])
+    tokens = pairs['token'].to_numpy(dtype=str)
+    vocabulary, starts = np.unique(tokens, return_index=True)
+    return {
+        'vocabulary': vocabulary,
+        'offsets': np.append(starts, len(tokens)).astype('int64'),
+        'positions': pairs['position'].to_numpy(dtype='int64'),
+        'cruise_ids': np.asarray(cruise_ids, dtype=str),
+    }
+
+def _metadata_pairs(mdf, keywords, first_position, fields):
+    """
+    Tokenizes the searchable fields of a metadata DataFrame into (token, position) pairs.
+    """
+    positions = np.arange(first_position, first_position + len(mdf))
+    if fields is None:
+        fields = SEARCH_FIELDS + [col for col in mdf.columns if 'chief' in col.lower()]
+
+    pairs = []
+    for field in fields:
+        if field not in mdf.columns:
+            continue
+        values = mdf[field]
+        if field == 'keyword_list':
+            values = pd.Series(values.to_numpy(), index=positions).explode()
+            pairs.append(_token_pairs(values.to_numpy(), values.index))
+        else:
+            pairs.append(_token_pairs(values.to_numpy(), positions))
+
+    # Keywords stored in a separate (cruise_id, keyword) table, as from compact_cruise_metadata
+    if keywords is not None and len(keywords) and 'cruise_id' in mdf.columns:
+        position_of = pd.Series(positions, index=mdf['cruise_id'].astype(str).to_numpy())
+        keywords = keywords[keywords['cruise_id'].astype(str).isin(position_of.index)]
+        pairs.append(_token_pairs(keywords['keyword'].astype(object).to_numpy(),
+                                  position_of.loc[keywords['cruise_id'].astype(str)].to_numpy()))
+
+    if not pairs:
+        return pd.DataFrame({'token': np.array([], dtype=str), 'position': np.array([], dtype='int64')})
+    return pd.concat(pairs, ignore_index=True)
+
+def build_search_index(mdf, keywords=None, fields=None):
+    """
+    Builds an inverted index mapping normalized tokens to cruise row positions.
+
+    Parameters
+    ----------
+    mdf : pandas.DataFrame
+        Cruise metadata, as returned by `get_cruise_metadata`.
+    keywords : pandas.DataFrame, optional
+        A (cruise_id, keyword) table, as returned by `compact_cruise_metadata`,
+        for frames without a 'keyword_list' column.
+    fields : list of str, optional
+        Columns to index. Defaults to 'keyword_list', 'cruise_name',
+        'waterbody_name' and any chief scientist columns.
+
+    Returns
+    -------
+    dict
+        The index, with keys 'vocabulary' (sorted tokens), 'offsets' and
+        'positions' (the posting list of token i is
+        ``positions[offsets[i]:offsets[i + 1]]``), and 'cruise_ids' (the cruise
+        ID of each row position).
+
+    Examples
+    --------
+    >>> import openspace_rvdata.r2r2df as r2r
+    >>> import openspace_rvdata.search as srch
+    >>> mdf = r2r.get_cruise_metadata("https://service.rvdata.us/api/cruise/")
+    >>> index = srch.build_search_index(mdf)
+    >>> lter = mdf.iloc[srch.search_cruises(index, "LTER")]
+    """
+    if 'cruise_id' in mdf.columns:
+        cruise_ids = mdf['cruise_id'].astype(str).to_numpy()
+    else:
+        cruise_ids = np.arange(len(mdf)).astype(str)
+    return _build_postings(_metadata_pairs(mdf, keywords, 0, fields), cruise_ids)
+
+def update_search_index(index, mdf, keywords=None, fields=None):
+    """
+    Adds new cruises to a search index.
+
+    Cruises whose 'cruise_id' is already indexed are skipped. The remaining
+    rows get the next row positions, in order, so the index matches
+    ``pd.concat([old_mdf, new_rows], ignore_index=True)`` where `new_rows`
+    are the rows of `mdf` that were not indexed yet.
+
+    Parameters
+    ----------
+    index : dict
+        The index from `build_search_index` or `load_search_index`.
+    mdf : pandas.DataFrame
+        Cruise metadata containing the new cruises.
+    keywords : pandas.DataFrame, optional
+        A (cruise_id, keyword) table for frames without a 'keyword_list' column.
+    fields : list of str, optional
+        Columns to index; see `build_search_index`.
+
+    Returns
+    -------
+    dict
+        The updated index.
+    """
+    new_rows = mdf[~mdf['cruise_id'].astype(str).isin(index['cruise_ids'])]
+    if new_rows.empty:
+        return index
+
+    counts = np.diff(index['offsets'])
+    old_pairs = pd.DataFrame({'token': np.repeat(index['vocabulary'], counts),
+                              'position': index['positions']})
+    new_pairs = _metadata_pairs(new_rows, keywords, len(index['cruise_ids']), fields)
+    cruise_ids = np.concatenate([index['cruise_ids'], new_rows['cruise_id'].astype(str).to_numpy()])
+    print(f"Added {len(new_rows)} cruises to search index.")
+    return _build_postings(pd.concat([old_pairs, new_pairs], ignore_index=True), cruise_ids)
+
+def _lookup(index, token, prefix=False):
+    """Returns the sorted row positions of a token, or of all tokens starting with it if `prefix`."""
+    vocabulary = index['vocabulary']
+    first = np.searchsorted(vocabulary, token, side='left')
+    if prefix:
+        last = np.searchsorted(vocabulary, token + '\uffff', side='left')
+    else:
+        last = first + 1 if first < len(vocabulary) and vocabulary[first] == token else first
+    positions = index['positions'][index['offsets'][first]:index['offsets'][last]]
+    return np.unique(positions) if prefix else positions
+
+def search_cruises(index, query, mode="and"):
+    """
+    Finds the cruises matching a query.
+
+    Each whitespace-separated term of the query is tokenized like the indexed
+    text; a term ending in '*' matches any token starting with it (e.g.
+    'antarc*'). Terms that tokenize into several tokens (e.g. 'Gulf-of-Mexico')
+    require all of them.
+
+    Parameters
+    ----------
+    index : dict
+        The index from `build_search_index` or `load_search_index`.
+    query : str or list of str
+        The query, e.g. "LTER palmer" or "antarc* arctic".
+    mode : {"and", "or"}, default "and"
+        Whether cruises must match all terms or any term.
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted row positions of the matching cruises, for use with
+        ``mdf.iloc``. ``index['cruise_ids'][positions]`` gives their cruise IDs.
+
+    Examples
+    --------
+    >>> import openspace_rvdata.search as srch
+    >>> positions = srch.search_cruises(index, "antarc* ctd", mode="and")
+    >>> mdf.iloc[positions]
+    """
+    if mode not in ("and", "or"):
+        raise ValueError(f"Unknown search mode '{mode}'; expected 'and' or 'or'.")
+    terms = query.split() if isinstance(query, str) else list(query)
+
+    results = []
+    for term in terms:
+        prefix = term.endswith('*')
+        tokens = tokenize(term)
+        if not tokens:
+            continue
+        matches = None
+        for i, token in enumerate(tokens):
+            # Only the last token of a prefix term is matched as a prefix
+            positions = _lookup(index, token, prefix=prefix and i == len(tokens) - 1)
+            matches = positions if matches is None else np.intersect1d(matches, positions, assume_unique=True)
+        results.append(matches)
+
+    if not results:
+        return np.array([], dtype='int64')
+    combined = results[0]
+    for positions in results[1:]:
+        if mode == "and":
+            combined = np.intersect1d(combined, positions, assume_unique=True)
+        else:
+            combined = np.union1d(combined, positions)
+    return combined
+
+def save_search_index(index, fname):
+    """
+    Saves a search index to a compressed .npz file.
+
+    Parameters
+    ----------
+    index : dict
+        The index from `build_search_index` or `update_search_index`.
+    fname : str
+        The output path (e.g. "tmp/cruise_search.npz").
+    """
+    np.savez_compressed(fname, **index)
+    print(f"Search index saved to {fname}")
+
+def load_search_index(fname):
+    """
+    Loads a search index saved with `save_search_index`.
+
+    Parameters
+    ----------
+    fname : str
+        The path to the .npz file.
+
+    Returns
+    -------
+    dict
+        The index, ready for `search_cruises` and `update_search_index`.
+    """
+    with np.load(fname) as data:
+        return {key: data[key] for key in ('vocabulary', 'offsets', 'positions', 'cruise_ids')}
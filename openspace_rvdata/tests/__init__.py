@@ -0,0 +1 @@
+"""Tests for openspace_rvdata."""
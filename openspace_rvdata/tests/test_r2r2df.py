@@ -0,0 +1,75 @@
+"""Tests of the incremental cruise metadata parser and column projection in r2r2df."""
+
+import json
+import unittest
+
+from openspace_rvdata.r2r2df import _iter_json_records, _read_cruise_records
+
+def _chunks(text, size):
+    """Splits the UTF-8 encoding of `text` into chunks of `size` bytes."""
+    body = text.encode('utf-8')
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+class TestIterJsonRecords(unittest.TestCase):
+    """Records must be parsed the same way wherever the chunk boundaries fall."""
+
+    def check(self, document, key="data"):
+        """Parses `document` at every chunk size and compares it with `json.loads`."""
+        text = json.dumps(document, ensure_ascii=False)
+        expected = json.loads(text)
+        for size in range(1, len(text.encode('utf-8')) + 1):
+            header = {}
+            records = list(_iter_json_records(_chunks(text, size), key=key, header=header))
+            self.assertEqual(records, expected[key], f"chunk size {size}")
+            self.assertEqual(header, {k: v for k, v in expected.items() if k != key}, f"chunk size {size}")
+
+    def test_one_byte_chunks(self):
+        """Every token is split across chunks."""
+        records = list(_iter_json_records(_chunks('{"data": [{"cruise_id": "RR2402"}, null, true]}', 1)))
+        self.assertEqual(records, [{"cruise_id": "RR2402"}, None, True])
+
+    def test_numbers(self):
+        """Numbers split after a digit, '.', 'e' or a sign are not cut short."""
+        self.check({"data": [12345, 6.7e8, -0.25, 1e-7, 3, 0, -12.5E+3]})
+        records = list(_iter_json_records(_chunks('{"data":[12345,6.7e8]}', 17)))
+        self.assertEqual(records, [12345, 6.7e8])
+
+    def test_number_at_end_of_document(self):
+        """A number ending the last chunk is returned once the input is exhausted."""
+        self.assertEqual(list(_iter_json_records(_chunks('{"data":[7,42]}', 13))), [7, 42])
+
+    def test_multibyte_utf8(self):
+        """Characters whose UTF-8 bytes straddle a chunk boundary are decoded intact."""
+        self.check({"data": [{"cruise_name": "Ñuñoa – Gulf of Alaska 🚢", "chief": "Zoë"}]})
+
+    def test_header_after_data(self):
+        """Top-level members after the array are still stored in the header."""
+        self.check({"status": 200, "data": [{"cruise_id": "A"}, {"cruise_id": "B"}], "message": "ok"})
+
+    def test_empty_array_and_object(self):
+        """Empty arrays and objects yield nothing."""
+        self.check({"data": [], "status": 200})
+        self.assertEqual(list(_iter_json_records([b'{}'])), [])
+
+    def test_truncated_input_raises(self):
+        """A body that ends inside the array is an error, not a silent partial result."""
+        with self.assertRaises(json.JSONDecodeError):
+            list(_iter_json_records(_chunks('{"data": [1, 2', 3)))
+
+class TestReadCruiseRecords(unittest.TestCase):
+    """Column projection must give the same schema as the eager `pd.json_normalize` path."""
+
+    def test_missing_requested_column_is_dropped(self):
+        """Requested keys that no record has are dropped."""
+        df = _read_cruise_records([{"cruise_id": "A"}, {"cruise_id": "B"}], ["cruise_id", "keyword"])
+        self.assertEqual(list(df.columns), ["cruise_id"])
+
+    def test_null_column_is_kept(self):
+        """Keys present with null values are kept."""
+        df = _read_cruise_records([{"cruise_id": "A"}, {"cruise_id": "B", "keyword": None}],
+                                  ["cruise_id", "keyword"])
+        self.assertEqual(list(df.columns), ["cruise_id", "keyword"])
+        self.assertTrue(df['keyword'].isna().all())
+
+if __name__ == '__main__':
+    unittest.main()
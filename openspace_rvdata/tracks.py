@@ -3,6 +3,7 @@
 import io
 import json
 import os
+import numpy as np
 import pandas as pd
 
 def get_comment_dataframe(fname):
@@ -48,6 +49,213 @@ def get_comment_dataframe(fname):
     df_comments = pd.DataFrame.from_dict(comment_data, orient='index', columns=['Value'])
     return df_comments
 
+# Candidate names for the time column of a geoCSV, in order of preference
+TIME_COLUMNS = ['iso_time', 'ISO_8601_UTC', 'Time_UTC', 'datetime', 'Timestamp', 'time']
+
+def to_utc_ns(times):
+    """
+    Converts timestamps to int64 nanoseconds since the epoch, UTC.
+
+    Parameters
+    ----------
+    times : str, datetime-like or array-like of them
+        The timestamps. Naive values are taken as UTC. Series and arrays are
+        passed to `pd.to_datetime` as they are, so tz-aware columns keep their
+        dtype instead of becoming arrays of Timestamp objects.
+
+    Returns
+    -------
+    numpy.ndarray
+        An int64 array with one value per timestamp (one element for a scalar).
+    """
+    if np.ndim(times) == 0:
+        times = [times]
+    times = pd.DatetimeIndex(pd.to_datetime(times, utc=True))
+    return times.tz_convert(None).values.astype('datetime64[ns]').astype('int64')
+
+def window_mask(times_ns, start=None, end=None):
+    """
+    Selects the timestamps that fall within a time window.
+
+    Parameters
+    ----------
+    times_ns : numpy.ndarray
+        int64 nanoseconds since the epoch, UTC, as returned by `to_utc_ns`.
+    start : str or datetime-like, optional
+        Start of the window (inclusive, UTC if no timezone is given).
+    end : str or datetime-like, optional
+        End of the window (inclusive, UTC if no timezone is given).
+
+    Returns
+    -------
+    numpy.ndarray
+        A boolean mask of the timestamps within [start, end].
+    """
+    mask = np.ones(len(times_ns), dtype=bool)
+    if start is not None:
+        mask &= times_ns >= to_utc_ns(start)[0]
+    if end is not None:
+        mask &= times_ns <= to_utc_ns(end)[0]
+    return mask
+
+def build_time_index(fname, stride=1000):
+    """
+    Builds a sidecar index mapping timestamps of a geoCSV file to byte offsets.
+
+    Every `stride`-th data row is recorded with its timestamp and the byte
+    offset at which it starts. The index is saved next to the geoCSV as
+    '{fname}.tidx' (JSON), along with the file size and modification time so
+    that stale indexes can be detected. Rows are assumed to be in
+    chronological order, as in R2R navigation products.
+
+    Parameters
+    ----------
+    fname : str
+        The path to the geoCSV file.
+    stride : int, default 1000
+        Number of data rows between index entries.
+
+    Returns
+    -------
+    dict
+        The index, with keys 'size', 'mtime', 'stride', 'header',
+        'time_column', 'data_offset', 'end_offset', 'times' and 'offsets'.
+
+    Raises
+    ------
+    ValueError
+        If the file has no header line.
+
+    Examples
+    --------
+    >>> import openspace_rvdata.tracks as trk
+    >>> index = trk.build_time_index("tmp/RR2402_1min.geoCSV")
+    """
+    header = None
+    times = []
+    offsets = []
+    data_offset = None
+    time_position = 0
+    n_rows = 0
+    with open(fname, 'rb') as f:
+        offset = f.tell()
+        for line in iter(f.readline, b''):
+            stripped = line.strip()
+            if stripped and not stripped.startswith(b'#'):
+                if header is None:
+                    header = line.decode('utf-8')
+                    fields = [field.strip() for field in header.strip().split(',')]
+                    time_column = next((col for col in TIME_COLUMNS if col in fields), fields[0])
+                    time_position = fields.index(time_column)
+                    data_offset = offset + len(line)
+                else:
+                    if n_rows % stride == 0:
+                        times.append(stripped.split(b',')[time_position].decode('utf-8'))
+                        offsets.append(offset)
+                    n_rows += 1
+            offset += len(line)
+
+    if header is None:
+        raise ValueError(f"No header line found in geoCSV file '{fname}'.")
+
+    stat = os.stat(fname)
+    index = {
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'stride': stride,
+        'header': header,
+        'time_column': time_column,
+        'data_offset': data_offset,
+        'end_offset': offset,
+        'times': times,
+        'offsets': offsets,
+    }
+    with open(f"{fname}.tidx", 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    print(f"Time index saved to {fname}.tidx ({len(offsets)} entries).")
+    return index
+
+def load_time_index(fname, stride=1000):
+    """
+    Loads the sidecar time index of a geoCSV file, building it if missing or stale.
+
+    Parameters
+    ----------
+    fname : str
+        The path to the geoCSV file.
+    stride : int, default 1000
+        Number of data rows between index entries, used if the index is (re)built.
+
+    Returns
+    -------
+    dict
+        The index, as returned by `build_time_index`.
+    """
+    index_path = f"{fname}.tidx"
+    if os.path.exists(index_path):
+        stat = os.stat(fname)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('size') == stat.st_size and index.get('mtime') == stat.st_mtime:
+                return index
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Warning: Couldn't read time index {index_path}: {e}. Rebuilding.")
+    return build_time_index(fname, stride)
+
+def read_geocsv_window(fname, start=None, end=None):
+    """
+    Reads only the rows of a geoCSV file that fall within a time window.
+
+    Uses the sidecar index from `load_time_index` to seek directly to the
+    first candidate row, so the time taken depends on the size of the window
+    rather than the size of the file.
+
+    Parameters
+    ----------
+    fname : str
+        The path to the geoCSV file.
+    start : str or datetime-like, optional
+        Start of the window (inclusive, UTC if no timezone is given).
+        Defaults to the start of the file.
+    end : str or datetime-like, optional
+        End of the window (inclusive, UTC if no timezone is given).
+        Defaults to the end of the file.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The rows within the window, with the same columns and values as
+        ``pd.read_csv(fname, comment='#')`` would give.
+
+    Examples
+    --------
+    >>> import openspace_rvdata.tracks as trk
+    >>> df = trk.read_geocsv_window("tmp/RR2402_1min.geoCSV", "2024-02-20", "2024-02-27")
+    """
+    index = load_time_index(fname)
+    entry_times = to_utc_ns(index['times']) if index['times'] else np.array([], dtype='int64')
+    begin_offset = index['data_offset']
+    end_offset = index['end_offset']
+    if start is not None and len(entry_times):
+        # Start from the last entry strictly before `start`, since rows of the previous stride
+        # may share the timestamp of an entry equal to `start`
+        i = np.searchsorted(entry_times, to_utc_ns(start)[0], side='left') - 1
+        begin_offset = index['offsets'][max(i, 0)]
+    if end is not None and len(entry_times):
+        j = np.searchsorted(entry_times, to_utc_ns(end)[0], side='right')
+        if j < len(entry_times):
+            end_offset = index['offsets'][j]
+
+    with open(fname, 'rb') as f:
+        f.seek(begin_offset)
+        chunk = f.read(max(end_offset - begin_offset, 0))
+    df = pd.read_csv(io.BytesIO(index['header'].encode('utf-8') + chunk), comment='#')
+
+    # Trim the rows before and after the window within the first and last strides
+    mask = window_mask(to_utc_ns(df[index['time_column']]), start, end)
+    return df[mask].reset_index(drop=True)
+
 def convert_geocsv_to_geojson(csv_file_path, output_geojson_path):
     """
     Converts a GeoCSV file into a GeoJSON LineString feature collection.
@@ -172,11 +380,17 @@ def format_row_to_text(row):
   }}"""
     return formatted_string
 
-def get_cruise_keyframes(fname, resample_rate="60min"):
+def get_cruise_keyframes(fname, resample_rate="60min", start=None, end=None):
     """
     Generates a keyframe asset from geoCSV; saves to local /tmp directory.
+
+    If `start` or `end` is given, only that time window of the geoCSV is read,
+    using its sidecar time index (see `read_geocsv_window`).
     """
-    df = pd.read_csv(fname, comment = '#')
+    if start is None and end is None:
+        df = pd.read_csv(fname, comment = '#')
+    else:
+        df = read_geocsv_window(fname, start, end)
     df['datetime'] = pd.to_datetime(df['iso_time'])
     df.index = df['datetime']
     df = df.resample(resample_rate).first()